@@ -51,9 +51,8 @@ class LRCParser:
         Returns:
             LRC格式时间字符串
         """
-        minutes = milliseconds // 60000
-        seconds = (milliseconds % 60000) // 1000
-        millis = milliseconds % 1000
+        total_seconds, millis = divmod(milliseconds, 1000)
+        minutes, seconds = divmod(total_seconds, 60)
         return f"[{minutes:02d}:{seconds:02d}.{millis:03d}]"
     
     def parse_lrc_content(self, text: str) -> List[Dict]:
@@ -66,33 +65,45 @@ class LRCParser:
         Returns:
             解析后的歌词列表，每个元素包含时间和内容
         """
-        if not text or not text.strip():
+        # 无时间标签的文本（如空译文）直接短路，跳过逐行处理
+        if not text or '[' not in text:
             return []
         
         lines = text.strip().split('\n')
         lyrics = []
-        
+
+        # 将热循环中的属性查找提升为局部变量
+        finditer = self.TIME_PATTERN.finditer
+        append = lyrics.append
+
         for line in lines:
             line = line.strip()
-            if not line:
+            # 快速预判：时间标签行必然以"[数字"开头，
+            # 跳过空行和[ti:]/[ar:]等元数据行，省去正则开销
+            if not line or line[0] != '[' or not line[1:2].isdigit():
                 continue
-                
-            # 查找所有时间标签
-            time_matches = re.findall(r'\[(\d+:\d+\.\d+)\]', line)
+
+            # 单次扫描提取所有时间标签及其位置
+            time_matches = list(finditer(line))
             if time_matches:
-                # 移除时间标签获取纯内容
-                content = re.sub(r'\[(\d+:\d+\.\d+)\]', '', line).strip()
+                # 时间标签之后的部分即为纯内容
+                content = line[time_matches[-1].end():].strip()
                 if content:
-                    for time_match in time_matches:
-                        try:
-                            time_ms = self.parse_lrc_time(time_match)
-                            lyrics.append({
-                                'time': time_ms,
-                                'content': content
-                            })
-                        except ValueError as e:
-                            print(f"警告: 跳过无效时间标签 '{time_match}': {e}")
-                            continue
+                    for match in time_matches:
+                        minutes, seconds, millis = match.groups()
+                        # 处理不同精度的毫秒
+                        if len(millis) == 2:
+                            millis_value = int(millis) * 10  # 转换为3位毫秒
+                        else:
+                            millis_value = int(millis[:3])   # 取前3位
+
+                        time_ms = (int(minutes) * 60000 +
+                                  int(seconds) * 1000 +
+                                  millis_value)
+                        append({
+                            'time': time_ms,
+                            'content': content
+                        })
         
         # 按时间排序
         lyrics.sort(key=lambda x: x['time'])
@@ -112,38 +123,42 @@ class LyricsMerger:
         Args:
             original_text: 原文歌词文本
             translated_text: 译文歌词文本
-            
+
         Returns:
-            合并后的歌词行列表
+            合并后的歌词行列表，每行不含换行符
         """
-        # 解析歌词
+        # 解析歌词（parse_lrc_content 已按时间排序）
         original_lyrics = self.parser.parse_lrc_content(original_text)
         translated_lyrics = self.parser.parse_lrc_content(translated_text)
-        
-        # 创建时间到内容的映射
-        original_dict = {lyric['time']: lyric['content'] for lyric in original_lyrics}
-        translated_dict = {lyric['time']: lyric['content'] for lyric in translated_lyrics}
-        
-        # 获取所有时间点并排序
-        all_times = sorted(set(original_dict.keys()) | set(translated_dict.keys()))
-        
-        # 合并歌词
+
+        format_time = self.parser.format_lrc_time
         merged_lines = []
-        for time_ms in all_times:
-            original_content = original_dict.get(time_ms, '')
-            translated_content = translated_dict.get(time_ms, '')
-            
-            if original_content and translated_content:
-                merged_line = f"{self.parser.format_lrc_time(time_ms)} {original_content} / {translated_content}"
-            elif original_content:
-                merged_line = f"{self.parser.format_lrc_time(time_ms)} {original_content}"
-            elif translated_content:
-                merged_line = f"{self.parser.format_lrc_time(time_ms)} {translated_content}"
+
+        # 线性归并两个有序列表，时间相同时合并为一行
+        i, j = 0, 0
+        while i < len(original_lyrics) and j < len(translated_lyrics):
+            original = original_lyrics[i]
+            translated = translated_lyrics[j]
+
+            if original['time'] == translated['time']:
+                merged_lines.append(
+                    f"{format_time(original['time'])} {original['content']} / {translated['content']}"
+                )
+                i += 1
+                j += 1
+            elif original['time'] < translated['time']:
+                merged_lines.append(f"{format_time(original['time'])} {original['content']}")
+                i += 1
             else:
-                continue
-                
-            merged_lines.append(merged_line)
-        
+                merged_lines.append(f"{format_time(translated['time'])} {translated['content']}")
+                j += 1
+
+        # 追加剩余未配对的歌词行
+        for lyric in original_lyrics[i:]:
+            merged_lines.append(f"{format_time(lyric['time'])} {lyric['content']}")
+        for lyric in translated_lyrics[j:]:
+            merged_lines.append(f"{format_time(lyric['time'])} {lyric['content']}")
+
         return merged_lines
 
 
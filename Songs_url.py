@@ -1,12 +1,29 @@
-import urllib.request
-import urllib.parse
-import urllib.error
+import re
+import requests
+import urllib3
 from html.parser import HTMLParser
 from html.entities import name2codepoint
-import ssl
 #import chardet
 from typing import List, Dict, Optional
 
+# 跳过证书校验时不输出告警（与原先CERT_NONE的行为一致）
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# 可选的C实现HTML解析器，不可用时回退到标准库的SongParser
+try:
+    from selectolax.parser import HTMLParser as _FastHTMLParser
+except ImportError:
+    _FastHTMLParser = None
+
+try:
+    import lxml.html as _lxml_html
+except ImportError:
+    _lxml_html = None
+
+# 从Content-Type头或HTML meta标签中提取字符集
+_CHARSET_RE = re.compile(r'charset=([\w-]+)', re.I)
+_META_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+
 
 class SongParser(HTMLParser):
     """HTML解析器，用于提取网易云音乐歌单中的歌曲信息"""
@@ -56,6 +73,37 @@ class SongParser(HTMLParser):
         return None
 
 
+def _extract_song_links(html_content: str) -> List[Dict]:
+    """
+    从歌单页面HTML中提取歌曲链接
+
+    优先使用C实现的解析器（selectolax/lxml），否则回退到SongParser
+    """
+    if _FastHTMLParser is not None:
+        tree = _FastHTMLParser(html_content)
+        return [
+            {"href": node.attributes.get("href"), "name": node.text(strip=True)}
+            for node in tree.css('ul.f-hide a')
+            if (node.attributes.get("href") or "").startswith("/song")
+            and node.text(strip=True)
+        ]
+
+    if _lxml_html is not None:
+        tree = _lxml_html.fromstring(html_content)
+        nodes = tree.xpath(
+            '//ul[contains(@class,"f-hide")]//a[starts-with(@href,"/song")]'
+        )
+        return [
+            {"href": node.get("href"), "name": node.text_content().strip()}
+            for node in nodes
+            if node.text_content().strip()
+        ]
+
+    parser = SongParser()
+    parser.feed(html_content)
+    return parser.song_links
+
+
 class SongExtractor:
     """歌曲信息提取器"""
     
@@ -65,27 +113,22 @@ class SongExtractor:
             'Referer': 'https://music.163.com/',
             'Cookie': cookie,
         }
-        self.ssl_context = self._create_ssl_context()
-    
-    def _create_ssl_context(self):
-        """创建SSL上下文"""
-        context = ssl.create_default_context()
-        context.check_hostname = False
-        context.verify_mode = ssl.CERT_NONE
-        return context
-    
-    def _detect_encoding(self, content):
-        """检测内容的编码（简化版，无需chardet）"""
-        common_encodings = ['utf-8', 'gbk', 'gb2312', 'gb18030', 'big5']
-    
-        for encoding in common_encodings:
-            try:
-                content.decode(encoding)
-                return encoding
-            except UnicodeDecodeError:
-                continue
-    
-    # 如果所有编码都失败，使用UTF-8并忽略错误
+        # 复用连接池，多次请求时省去重复的TCP/TLS握手
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.verify = False
+
+    def _detect_encoding(self, content_type: str, content: bytes) -> str:
+        """从Content-Type头或页面头部的meta标签检测编码（无需试解码全文）"""
+        match = _CHARSET_RE.search(content_type or '')
+        if match:
+            return match.group(1)
+
+        # 头部未声明时只扫描前2KB查找<meta charset=...>
+        match = _META_RE.search(content[:2048])
+        if match:
+            return match.group(1).decode('ascii')
+
         return 'utf-8'
     
     def get_song_links(self, playlist_url: str) -> List[Dict]:
@@ -102,35 +145,24 @@ class SongExtractor:
         effective_url = playlist_url.replace('/#', '')
         
         try:
-            # 创建请求
-            req = urllib.request.Request(effective_url, headers=self.headers)
-            
             # 发送请求
-            with urllib.request.urlopen(req, context=self.ssl_context, timeout=30) as response:
-                html_content_bytes = response.read()
-            
-            # 检测编码并解码
-            encoding = self._detect_encoding(html_content_bytes)
-            try:
-                html_content = html_content_bytes.decode(encoding)
-            except UnicodeDecodeError:
-                # 如果检测的编码失败，尝试UTF-8和GBK
-                try:
-                    html_content = html_content_bytes.decode('utf-8')
-                except UnicodeDecodeError:
-                    html_content = html_content_bytes.decode('gbk', errors='replace')
-            
+            response = self.session.get(effective_url, timeout=30)
+            response.raise_for_status()
+
+            # 头部未声明字符集时从页面meta标签检测，避免requests默认回退到latin-1
+            content_type = response.headers.get('Content-Type', '')
+            if 'charset' not in content_type.lower():
+                response.encoding = self._detect_encoding(content_type, response.content)
+            html_content = response.text
+
             # 解析HTML
-            parser = SongParser()
-            parser.feed(html_content)
-            
-            return parser.song_links
-            
-        except urllib.error.URLError as e:
+            return _extract_song_links(html_content)
+
+        except requests.exceptions.RequestException as e:
             print(f"网络请求错误: {e}")
         except Exception as e:
             print(f"提取过程中出现错误: {e}")
-        
+
         return []
     
     def get_songs_url_list(self, playlist_url: str) -> List[str]:
@@ -1,20 +1,36 @@
+import hashlib
+import json
 import os
+import shutil
 import time
+import uuid
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from mutagen.mp3 import MP3
 from mutagen.id3 import ID3
 from mutagen.id3._frames import APIC, TIT2, TPE1, TALB
-from mutagen.id3._util import ID3NoHeaderError
 from Songs_url import get_songs_url_list
 from Lyrics import merge_lyrics
 import random
 
+# 可选的orjson（Rust实现）加速JSON解析，不可用时回退到标准库
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 文件名非法字符的替换表，单次translate代替逐字符replace
+_SANITIZE_TABLE = str.maketrans({char: ',' for char in '<>:"/\\|?*'})
+
 
 class MusicDownloader:
     def __init__(self, base_dir="C:/Users/"):
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        # 歌曲元数据的本地缓存目录，重跑时跳过已获取的API请求
+        self.cache_dir = Path('.cache')
+        self.cache_dir.mkdir(exist_ok=True)
         self.session = requests.Session()
         # 设置更友好的请求头
         self.session.headers.update({
@@ -30,15 +46,15 @@ class MusicDownloader:
             try:
                 response = self.session.get(url, stream=True, timeout=30)
                 response.raise_for_status()
-                
+
                 filepath = Path(filepath)
                 filepath.parent.mkdir(parents=True, exist_ok=True)
-                
+
+                # 以1MiB块在C层直接拷贝到磁盘，避免Python级小块循环
+                response.raw.decode_content = True
                 with open(filepath, 'wb') as file:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            file.write(chunk)
-                
+                    shutil.copyfileobj(response.raw, file, length=1024 * 1024)
+
                 print(f"✓ 文件已保存: {filepath}")
                 return True
                 
@@ -51,16 +67,62 @@ class MusicDownloader:
                 else:
                     return False
     
+    def download_binary_bytes(self, url, max_retries=3):
+        """下载二进制内容到内存，带有重试机制"""
+        for attempt in range(max_retries):
+            try:
+                response = self.session.get(url, timeout=30)
+                response.raise_for_status()
+                return response.content
+
+            except requests.exceptions.RequestException as e:
+                print(f"✗ 下载失败 (尝试 {attempt+1}/{max_retries}): {e}")
+                if attempt < max_retries - 1:
+                    wait_time = (attempt + 1) * 5  # 递增等待时间
+                    print(f"等待 {wait_time} 秒后重试...")
+                    time.sleep(wait_time)
+                else:
+                    return None
+
     def get_song_data(self, song_url, max_retries=3):
-        """获取歌曲数据，带有重试机制"""
+        """获取歌曲数据，带有重试机制和本地缓存"""
+        # 先查本地缓存，命中则完全跳过网络请求
+        cache_key = hashlib.md5(song_url.encode()).hexdigest()
+        cache_path = self.cache_dir / f"{cache_key}.json"
+        if cache_path.exists():
+            try:
+                with open(cache_path, 'rb') as f:
+                    raw = f.read()
+                if orjson is not None:
+                    return orjson.loads(raw)
+                return json.loads(raw)
+            except (OSError, ValueError):
+                pass  # 缓存损坏时重新获取
+
         api_url = f"https://api.kxzjoker.cn/api/163_music?url={song_url}&userid=8719916627&dlt=0846&level=standard&type=json"
-        
+
         for attempt in range(max_retries):
             try:
                 response = self.session.get(api_url, timeout=30)
                 response.raise_for_status()
-                return response.json()
-                
+                if orjson is not None:
+                    song_data = orjson.loads(response.content)
+                else:
+                    song_data = response.json()
+
+                # 写入缓存供下次运行复用
+                try:
+                    if orjson is not None:
+                        cache_bytes = orjson.dumps(song_data)
+                    else:
+                        cache_bytes = json.dumps(song_data, ensure_ascii=False).encode('utf-8')
+                    with open(cache_path, 'wb') as f:
+                        f.write(cache_bytes)
+                except OSError:
+                    pass  # 缓存写入失败不影响主流程
+
+                return song_data
+
             except requests.exceptions.RequestException as e:
                 print(f"✗ 获取歌曲数据失败 (尝试 {attempt+1}/{max_retries}): {e}")
                 if attempt < max_retries - 1:
@@ -70,53 +132,34 @@ class MusicDownloader:
                 else:
                     return None
     
-    def embed_metadata_to_mp3(self, mp3_path, cover_path, title, artist, album):
-        """将元数据嵌入MP3文件"""
+    def embed_metadata_to_mp3(self, mp3_path, cover_data, title, artist, album):
+        """将元数据嵌入MP3文件，封面直接使用内存中的图片数据"""
         try:
             # 确保文件存在
             mp3_path = Path(mp3_path)
-            cover_path = Path(cover_path)
-            
+
             if not mp3_path.exists():
                 print(f"✗ MP3文件不存在: {mp3_path}")
                 return False
-                
-            if not cover_path.exists():
-                print(f"✗ 封面文件不存在: {cover_path}")
-                return False
-            
-            # 读取图片数据
-            with open(cover_path, 'rb') as f:
-                cover_data = f.read()
-            
+
             # 处理MP3文件 - 使用字符串路径而不是Path对象
-            try:
-                audio = MP3(str(mp3_path), ID3=ID3)
-            except ID3NoHeaderError:
-                audio = MP3(str(mp3_path))
-                audio.add_tags()
-            
-            # 确保tags存在
+            # 只构造一次，无标签的文件直接补建tags，不再重新解析
+            audio = MP3(str(mp3_path), ID3=ID3)
             if audio.tags is None:
                 audio.add_tags()
-            
-            # 清除可能存在的旧标签
-            try:
-                audio.tags.delete()
-            except:
-                pass  # 如果删除失败，继续
-            
-            # 添加标题 (TIT2)
-            audio.tags.add(TIT2(encoding=3, text=title))
-            
-            # 添加艺术家 (TPE1)
-            audio.tags.add(TPE1(encoding=3, text=artist))
-            
-            # 添加专辑 (TALB)
-            audio.tags.add(TALB(encoding=3, text=album))
-            
-            # 添加封面
-            audio.tags.add(
+
+            # 用setall整帧替换，旧标签无需先删除再重写
+            # 标题 (TIT2)
+            audio.tags.setall('TIT2', [TIT2(encoding=3, text=title)])
+
+            # 艺术家 (TPE1)
+            audio.tags.setall('TPE1', [TPE1(encoding=3, text=artist)])
+
+            # 专辑 (TALB)
+            audio.tags.setall('TALB', [TALB(encoding=3, text=album)])
+
+            # 封面
+            audio.tags.setall('APIC', [
                 APIC(
                     encoding=3,
                     mime='image/png',
@@ -124,9 +167,9 @@ class MusicDownloader:
                     desc='Cover',
                     data=cover_data
                 )
-            )
-            
-            # 保存文件
+            ])
+
+            # 保存文件（仅此一次磁盘写入）
             audio.save()
             print(f"✓ 元数据嵌入成功: {mp3_path}")
             return True
@@ -136,21 +179,25 @@ class MusicDownloader:
             return False
     
     def create_unique_directory(self, base_name):
-        """创建唯一的目录名"""
+        """创建唯一的目录名（多线程下无竞态）"""
         base_path = self.base_dir / base_name
-        path = base_path
-        counter = 1
-        
-        while path.exists():
-            path = base_path.parent / f"{base_path.name}({counter})"
-            counter += 1
-        
-        path.mkdir(parents=True)
-        return path
+
+        # 直接尝试创建，冲突时追加短随机后缀，避免exists()探测的竞态
+        try:
+            base_path.mkdir(parents=True)
+            return base_path
+        except FileExistsError:
+            path = base_path.parent / f"{base_path.name}-{uuid.uuid4().hex[:6]}"
+            path.mkdir(parents=True)
+            return path
     
-    def process_song(self, song_url):
+    def process_song(self, song_url, base_delay=0, jitter=0):
         """处理单首歌曲下载"""
         try:
+            # 请求前随机延迟，避免并发下请求过于频繁
+            if base_delay or jitter:
+                time.sleep(base_delay + random.uniform(0, jitter))
+
             # 获取歌曲信息
             song_data = self.get_song_data(song_url)
             if song_data is None:
@@ -173,41 +220,32 @@ class MusicDownloader:
             
             # 文件路径
             mp3_path = song_dir / f"{folder_name}.mp3"
-            cover_path = song_dir / f"{folder_name}.png"
             lrc_path = song_dir / f"{folder_name}.lrc"
-            
+
             print(f"开始下载: {song_name} - {artist_name} - {album_name}")
-            
-            # 下载文件
+
+            # 下载文件，封面直接保留在内存中
             if not self.download_binary_file(song_data["url"], mp3_path):
                 return False
-                
-            if not self.download_binary_file(song_data["pic"], cover_path):
+
+            cover_data = self.download_binary_bytes(song_data["pic"])
+            if cover_data is None:
                 return False
-            
-            # 等待文件完全写入
-            time.sleep(1)
-            
+
             # 嵌入元数据
             if not self.embed_metadata_to_mp3(
-                mp3_path, 
-                cover_path, 
+                mp3_path,
+                cover_data,
                 title=song_name,
                 artist=artist_name,
                 album=album_name
             ):
                 return False
-            
-            # 删除临时封面文件
-            try:
-                cover_path.unlink()
-            except OSError:
-                pass  # 如果文件不存在或无法删除，忽略错误
-            
+
             # 保存歌词
             lyrics_content = merge_lyrics(song_data["lyric"], song_data["tlyric"])
             with open(lrc_path, "w", encoding="utf-8") as f:
-                f.write("".join(lyrics_content))
+                f.write("\n".join(lyrics_content) + "\n")
             
             print(f"✓ 歌曲处理完成: {folder_name}")
             return True
@@ -223,35 +261,34 @@ class MusicDownloader:
         """清理文件名中的非法字符"""
         if not filename:
             return "unknown"
-            
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, ',')
-        return filename.strip()
+
+        return filename.translate(_SANITIZE_TABLE).strip()
     
-    def download_playlist(self, playlist_url, base_delay=1, jitter=1):
-        """下载整个歌单，带有随机延迟"""
+    def download_playlist(self, playlist_url, base_delay=1, jitter=1, max_workers=4):
+        """下载整个歌单，多线程并发处理，带有随机延迟"""
         print(f"开始处理歌单: {playlist_url}")
         song_urls = get_songs_url_list(playlist_url)
-        
+
         if not song_urls:
             print("未获取到歌曲列表")
             return
-        
+
         print(f"找到 {len(song_urls)} 首歌曲")
-        
+
+        # 每首歌曲以网络I/O为主，用线程池并发处理
         success_count = 0
-        for i, song_url in enumerate(song_urls, 1):
-            print(f"\n[{i}/{len(song_urls)}] 处理歌曲...")
-            if self.process_song(song_url):
-                success_count += 1
-            
-            # 在歌曲之间添加随机延迟，避免请求过于频繁
-            if i < len(song_urls):  # 最后一首歌曲后不需要延迟
-                delay = base_delay + random.uniform(0, jitter)
-                print(f"等待 {delay:.1f} 秒后处理下一首歌曲...")
-                time.sleep(delay)
-        
+        finished_count = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.process_song, song_url, base_delay, jitter)
+                for song_url in song_urls
+            ]
+            for future in as_completed(futures):
+                finished_count += 1
+                if future.result():
+                    success_count += 1
+                print(f"[{finished_count}/{len(song_urls)}] 歌曲处理完毕")
+
         print(f"\n🎉 下载完成! 成功: {success_count}/{len(song_urls)}")
 
 